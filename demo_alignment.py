@@ -0,0 +1,47 @@
+"""
+Demo script for the interactive image alignment widget.
+
+Opens napari with a striped base image and a smaller image to align,
+and docks the alignment widget.
+"""
+import napari
+import numpy as np
+
+from image_alignment import InteractiveImageAlignment
+
+
+def create_demo_images(base_shape=(600, 800), small_shape=(150, 200)):
+    """Create a striped base image and a smaller gradient image."""
+    height, width = base_shape
+
+    # Stripes 10 pixels wide every 50 pixels, built from 1D masks
+    base_image = np.zeros(base_shape, dtype=np.uint8)
+    rows = (np.arange(height) % 50) < 10
+    cols = (np.arange(width) % 50) < 10
+    base_image[rows] = 100
+    base_image[:, cols] = 150
+
+    # Diagonal gradient so the small image's orientation is visible
+    small_h, small_w = small_shape
+    small_image = np.add.outer(
+        np.linspace(0, 127, small_h), np.linspace(0, 128, small_w)
+    ).astype(np.uint8)
+
+    return base_image, small_image
+
+
+def main():
+    base_image, small_image = create_demo_images()
+
+    viewer = napari.Viewer()
+    viewer.add_image(base_image, name="Base")
+    viewer.add_image(small_image, name="Small")
+
+    alignment_widget = InteractiveImageAlignment(viewer)
+    viewer.window.add_dock_widget(alignment_widget, name="Alignment")
+
+    napari.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,29 @@
 """
 Tests for the interactive image alignment widget.
 """
+import dask.array as da
 import numpy as np
 import pytest
 
-from image_alignment._widget import InteractiveImageAlignment
-
-
-class MockWidget:
-    """Mock widget class for testing padding functionality without Qt dependencies."""
-    
-    def _pad_image_to_position(self, small_image: np.ndarray, target_shape, translate):
-        """Padding method copied from InteractiveImageAlignment for testing."""
-        # Convert translate to integer pixel coordinates
-        if len(translate) != len(target_shape):
-            # Handle 2D vs 3D cases
-            if len(target_shape) == 2 and len(translate) >= 2:
-                offset_y, offset_x = int(translate[-2]), int(translate[-1])
-            elif len(target_shape) == 3 and len(translate) >= 3:
-                offset_z, offset_y, offset_x = int(translate[-3]), int(translate[-2]), int(translate[-1])
-            else:
-                offset_y, offset_x = 0, 0
-                if len(target_shape) == 3:
-                    offset_z = 0
-        else:
-            if len(target_shape) == 2:
-                offset_y, offset_x = int(translate[0]), int(translate[1])
-            else:
-                offset_z, offset_y, offset_x = int(translate[0]), int(translate[1]), int(translate[2])
-        
-        # Create padded image filled with zeros
-        padded = np.zeros(target_shape, dtype=small_image.dtype)
-        
-        # Calculate bounds for placement
-        if len(target_shape) == 2:
-            h, w = small_image.shape[:2]
-            
-            # Ensure placement is within bounds
-            start_y = max(0, offset_y)
-            start_x = max(0, offset_x)
-            end_y = min(target_shape[0], offset_y + h)
-            end_x = min(target_shape[1], offset_x + w)
-            
-            # Calculate corresponding regions in source image
-            src_start_y = max(0, -offset_y)
-            src_start_x = max(0, -offset_x)
-            src_end_y = src_start_y + (end_y - start_y)
-            src_end_x = src_start_x + (end_x - start_x)
-            
-            # Place the image
-            if end_y > start_y and end_x > start_x:
-                padded[start_y:end_y, start_x:end_x] = small_image[src_start_y:src_end_y, src_start_x:src_end_x]
-        
-        else:  # 3D case
-            d, h, w = small_image.shape[:3]
-            
-            start_z = max(0, offset_z)
-            start_y = max(0, offset_y)
-            start_x = max(0, offset_x)
-            end_z = min(target_shape[0], offset_z + d)
-            end_y = min(target_shape[1], offset_y + h)
-            end_x = min(target_shape[2], offset_x + w)
-            
-            src_start_z = max(0, -offset_z)
-            src_start_y = max(0, -offset_y)
-            src_start_x = max(0, -offset_x)
-            src_end_z = src_start_z + (end_z - start_z)
-            src_end_y = src_start_y + (end_y - start_y)
-            src_end_x = src_start_x + (end_x - start_x)
-            
-            if end_z > start_z and end_y > start_y and end_x > start_x:
-                padded[start_z:end_z, start_y:end_y, start_x:end_x] = \
-                    small_image[src_start_z:src_end_z, src_start_y:src_end_y, src_start_x:src_end_x]
-        
-        return padded
+from image_alignment import _widget
+from image_alignment._widget import (
+    InteractiveImageAlignment,
+    _border_strips,
+    _compute_slices,
+    _pad_image,
+    _pad_image_lazy,
+    _place,
+    _placement_plan,
+    _quantize_to_uint8,
+    _resolve_offsets,
+)
+
+
+def _pad(small_image: np.ndarray, target_shape, translate):
+    """Pad at ``translate`` with the widget's default size threshold."""
+    offset = _resolve_offsets(translate, target_shape)
+    return _pad_image(small_image, target_shape, offset,
+                      InteractiveImageAlignment.LARGE_BYTES_THRESHOLD)
 
 
 def test_pad_image_to_position_2d():
@@ -83,11 +33,8 @@ def test_pad_image_to_position_2d():
     target_shape = (50, 60)
     translate = (5.0, 10.0)  # offset_y=5, offset_x=10
     
-    # Create mock widget instance
-    widget = MockWidget()
-    
     # Test padding
-    padded = widget._pad_image_to_position(small_image, target_shape, translate)
+    padded = _pad(small_image, target_shape, translate)
     
     # Check shape
     assert padded.shape == target_shape
@@ -103,18 +50,16 @@ def test_pad_image_to_position_edge_cases():
     small_image = np.ones((10, 10), dtype=np.uint8) * 128
     target_shape = (20, 20)
     
-    widget = MockWidget()
-    
     # Test negative offset (should crop the small image)
     translate = (-5.0, -3.0)
-    padded = widget._pad_image_to_position(small_image, target_shape, translate)
+    padded = _pad(small_image, target_shape, translate)
     assert padded.shape == target_shape
     # Only part of the small image should be visible at top-left
     assert np.all(padded[0:5, 0:7] == 128)
     
     # Test offset that goes beyond target bounds
     translate = (15.0, 15.0)
-    padded = widget._pad_image_to_position(small_image, target_shape, translate)
+    padded = _pad(small_image, target_shape, translate)
     assert padded.shape == target_shape
     # Only part of the small image should fit
     assert np.all(padded[15:20, 15:20] == 128)
@@ -126,9 +71,7 @@ def test_pad_image_to_position_3d():
     target_shape = (20, 50, 60)
     translate = (2.0, 5.0, 10.0)  # offset_z=2, offset_y=5, offset_x=10
     
-    widget = MockWidget()
-    
-    padded = widget._pad_image_to_position(small_image, target_shape, translate)
+    padded = _pad(small_image, target_shape, translate)
     
     # Check shape
     assert padded.shape == target_shape
@@ -142,21 +85,203 @@ def test_pad_image_to_position_3d():
     assert np.all(padded[:, :, 0:10] == 0)  # Before x
 
 
-def test_different_dtypes():
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.float64])
+def test_different_dtypes(dtype):
     """Test that padding preserves different data types."""
-    dtypes = [np.uint8, np.uint16, np.float32, np.float64]
+    small_image = np.ones((5, 5), dtype=dtype) * 100
+    target_shape = (10, 10)
+    translate = (2.0, 3.0)
     
-    for dtype in dtypes:
-        small_image = np.ones((5, 5), dtype=dtype) * 100
-        target_shape = (10, 10)
-        translate = (2.0, 3.0)
-        
-        widget = MockWidget()
-        padded = widget._pad_image_to_position(small_image, target_shape, translate)
+    padded = _pad(small_image, target_shape, translate)
+    
+    assert padded.dtype == dtype
+    assert padded.shape == target_shape
+    assert np.all(padded[2:7, 3:8] == 100)
+
+
+def test_identity_padding_returns_input():
+    """Test that padding to the same shape at zero offset does not copy."""
+    image = np.ones((30, 40))
+    
+    assert _pad(image, (30, 40), (0, 0)) is image
+
+
+def test_out_of_bounds_padding_is_zero():
+    """Test that a placement entirely outside the target yields read-only zeros."""
+    small_image = np.ones((10, 10), dtype=np.uint8)
+    
+    padded = _pad(small_image, (20, 20), (25, -3))
+    assert padded.shape == (20, 20)
+    assert padded.dtype == np.uint8
+    assert not padded.any()
+    assert not padded.flags.writeable
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+def test_cv2_padding_matches_numpy(monkeypatch, dtype):
+    """Test that the OpenCV border fill matches the NumPy placement."""
+    if _widget.cv2 is None:
+        pytest.skip("opencv is not installed")
+    
+    small_image = np.arange(1, 151).reshape(10, 15).astype(dtype)
+    target_shape = (50, 60)
+    
+    for translate in [(5.0, 10.0), (0.0, 0.0), (40.0, 45.0)]:
+        with_cv2 = _pad(small_image, target_shape, translate)
+        with monkeypatch.context() as m:
+            m.setattr(_widget, "cv2", None)
+            with_numpy = _pad(small_image, target_shape, translate)
         
-        assert padded.dtype == dtype
-        assert padded.shape == target_shape
-        assert np.all(padded[2:7, 3:8] == 100)
+        assert with_cv2.dtype == with_numpy.dtype
+        np.testing.assert_array_equal(with_cv2, with_numpy)
+
+
+def test_compute_slices():
+    """Test destination/source slice computation for inside and clipped placements."""
+    # Fully inside the target
+    dst, src = _compute_slices((5, 10), (10, 15), (50, 60))
+    assert dst == (slice(5, 15), slice(10, 25))
+    assert src == (slice(0, 10), slice(0, 15))
+    
+    # Clipped at the top-left and bottom-right corners
+    dst, src = _compute_slices((-5, 15), (10, 10), (20, 20))
+    assert dst == (slice(0, 5), slice(15, 20))
+    assert src == (slice(5, 10), slice(0, 5))
+    
+    # Entirely outside the target yields empty regions
+    dst, src = _compute_slices((30, 0), (10, 10), (20, 20))
+    assert dst[0].stop == dst[0].start
+    
+    # The same code path handles any number of dimensions
+    dst, src = _compute_slices((-1, 2, 55), (5, 10, 15), (20, 50, 60))
+    assert dst == (slice(0, 4), slice(2, 12), slice(55, 60))
+    assert src == (slice(1, 5), slice(0, 10), slice(0, 5))
+
+
+def test_pad_image_lazy_matches_eager():
+    """Test that the lazy padded array matches the eagerly padded one."""
+    small_image = np.arange(1, 151, dtype=np.uint16).reshape(10, 15)
+    target_shape = (50, 60)
+    
+    for offset in [(5, 10), (-5, -3), (45, 55), (60, 0)]:
+        lazy = _pad_image_lazy(small_image, target_shape, offset)
+        assert lazy.shape == target_shape
+        assert lazy.dtype == small_image.dtype
+        expected = _pad(small_image, target_shape, offset)
+        np.testing.assert_array_equal(lazy.compute(), expected)
+
+
+@pytest.mark.parametrize("small_shape, target_shape, offset, chunksize", [
+    ((30, 40), (1500, 1300), (700, 1200), (1024, 1024)),
+    ((2, 30, 40), (3, 600, 700), (1, 500, -4), (1, 512, 512)),
+])
+def test_large_output_is_lazy(small_shape, target_shape, offset, chunksize):
+    """Test that outputs above the size threshold are padded lazily."""
+    small_image = np.arange(1, np.prod(small_shape) + 1, dtype=np.uint16).reshape(small_shape)
+    expected = _pad(small_image, target_shape, offset)
+    assert isinstance(expected, np.ndarray)
+    
+    padded = _pad_image(small_image, target_shape, offset, large_bytes_threshold=1024)
+    
+    assert isinstance(padded, da.Array)
+    assert padded.chunksize == chunksize
+    np.testing.assert_array_equal(padded.compute(), expected)
+
+
+def test_quantize_to_uint8():
+    """Test that float64 images are mapped onto the full uint8 range."""
+    image = np.array([[-1.0, 0.0], [1.0, 3.0]])
+    quantized, lo, hi = _quantize_to_uint8(image)
+    
+    assert quantized.dtype == np.uint8
+    assert (lo, hi) == (-1.0, 3.0)
+    assert quantized[0, 0] == 0
+    assert quantized[1, 1] == 255
+    
+    # A constant image maps to zeros instead of dividing by zero
+    quantized, lo, hi = _quantize_to_uint8(np.full((3, 3), 7.0))
+    assert not quantized.any()
+    
+    # Values round to the nearest level rather than truncating
+    quantized, lo, hi = _quantize_to_uint8(np.array([0.0, 0.999, 1.0]))
+    assert quantized.tolist() == [0, 255, 255]
+    
+    # NaNs are ignored for the range and map to 0
+    quantized, lo, hi = _quantize_to_uint8(np.array([np.nan, 2.0, 4.0]))
+    assert (lo, hi) == (2.0, 4.0)
+    assert quantized.tolist() == [0, 0, 255]
+    
+    # Infinities are excluded from the range the same way
+    quantized, lo, hi = _quantize_to_uint8(np.array([-np.inf, 2.0, 4.0, np.inf]))
+    assert (lo, hi) == (2.0, 4.0)
+    assert quantized.tolist() == [0, 0, 255, 0]
+
+
+def test_resolve_offsets():
+    """Test that translations are aligned to the trailing axes of the target."""
+    assert _resolve_offsets((5.0, 10.0), (50, 60)) == (5, 10)
+    assert _resolve_offsets((2.0, 5.0, 10.0), (50, 60)) == (5, 10)
+    assert _resolve_offsets((5.0, 10.0), (20, 50, 60)) == (0, 5, 10)
+    assert _resolve_offsets((), (50, 60)) == (0, 0)
+
+
+def test_border_strips():
+    """Test that the border strips cover exactly the elements outside the region."""
+    array = np.full((6, 7, 8), 9, dtype=np.uint8)
+    region = (slice(1, 4), slice(2, 7), slice(0, 5))
+    for strip in _border_strips(region):
+        array[strip].fill(0)
+    
+    expected = np.zeros((6, 7, 8), dtype=np.uint8)
+    expected[region] = 9
+    np.testing.assert_array_equal(array, expected)
+    
+    # An empty region clears the whole array
+    array = np.full((4, 5), 9, dtype=np.uint8)
+    for strip in _border_strips((slice(4, 4), slice(0, 5))):
+        array[strip].fill(0)
+    assert not array.any()
+
+
+def test_placement_plan():
+    """Test that only fully inside placements skip the source slices."""
+    dst, src, strips = _placement_plan((5, 10), (10, 15), (50, 60))
+    assert dst == (slice(5, 15), slice(10, 25))
+    assert src is None
+    assert strips == _border_strips(dst)
+    
+    # Touching the far edges still counts as fully inside
+    dst, src, _ = _placement_plan((40, 45), (10, 15), (50, 60))
+    assert src is None
+    
+    # Clipped placements fall back to the clamped slices
+    dst, src, strips = _placement_plan((-5, 15), (10, 10), (20, 20))
+    assert (dst, src) == _compute_slices((-5, 15), (10, 10), (20, 20))
+    assert strips == _border_strips(dst)
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float16, ">u2"])
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_place_3d(monkeypatch, use_numba, dtype):
+    """Test 3D placement through the numba kernel and the tiled NumPy copy."""
+    if use_numba and _widget._blit3d is None:
+        pytest.skip("numba is not installed")
+    if not use_numba:
+        monkeypatch.setattr(_widget, "_blit3d", None)
+        monkeypatch.setattr(_widget, "_TILE_BYTES", 64)
+    
+    # A transposed source exercises strides that differ from the output;
+    # float16 and big-endian data must fall back from the numba kernel
+    small_image = np.arange(6 * 7 * 8).astype(dtype).reshape(8, 7, 6).T
+    target_shape = (10, 12, 14)
+    dst, src = _compute_slices((-2, 3, 9), small_image.shape, target_shape)
+    
+    padded = np.zeros(target_shape, dtype=dtype)
+    _place(padded, small_image, dst, src)
+    
+    expected = np.zeros(target_shape, dtype=dtype)
+    expected[dst] = small_image[src]
+    np.testing.assert_array_equal(padded, expected)
 
 
 if __name__ == "__main__":
@@ -164,5 +289,12 @@ if __name__ == "__main__":
     test_pad_image_to_position_2d()
     test_pad_image_to_position_edge_cases()
     test_pad_image_to_position_3d()
-    test_different_dtypes()
+    for dtype in [np.uint8, np.uint16, np.float32, np.float64]:
+        test_different_dtypes(dtype)
+    test_compute_slices()
+    test_pad_image_lazy_matches_eager()
+    test_quantize_to_uint8()
+    test_resolve_offsets()
+    test_border_strips()
+    test_placement_plan()
     print("All tests passed!")
\ No newline at end of file
@@ -51,3 +51,132 @@ def test_image_padding_function(make_napari_viewer):
     # Check that the small image is placed correctly (non-zero values should be in center)
     assert np.sum(padded[25:75, 25:75]) > 0  # Center should have values
     assert np.sum(padded[0:25, 0:25]) == 0   # Top-left corner should be empty
+
+
+def test_layer_choices_follow_viewer(make_napari_viewer):
+    """Test that the layer dropdowns track image layers added and removed."""
+    viewer = make_napari_viewer()
+    base_layer = viewer.add_image(np.zeros((20, 20)), name="base_image")
+    
+    widget = InteractiveImageAlignment(viewer)
+    assert base_layer in widget._base_image_combo.choices
+    
+    small_layer = viewer.add_image(np.zeros((5, 5)), name="small_image")
+    viewer.add_points(name="points")
+    assert widget._small_image_combo.choices == (base_layer, small_layer)
+    
+    viewer.layers.remove(small_layer)
+    assert widget._small_image_combo.choices == (base_layer,)
+
+
+def test_alignment_does_not_copy_small_image(make_napari_viewer):
+    """Test that aligning reuses the small image data and restores its layer."""
+    viewer = make_napari_viewer()
+    base_layer = viewer.add_image(np.zeros((200, 200)), name="base_image")
+    small_image = np.random.random((50, 50))
+    small_layer = viewer.add_image(small_image, name="small_image")
+    
+    widget = InteractiveImageAlignment(viewer)
+    widget._base_image_combo.value = base_layer
+    widget._small_image_combo.value = small_layer
+    
+    widget._start_alignment()
+    assert widget._overlay_layer is small_layer
+    assert small_layer.data is small_image
+    assert small_layer.blending == "additive"
+    
+    small_layer.translate = (30, 40)
+    widget._apply_padding()
+    
+    aligned_layer = viewer.layers["small_image_aligned"]
+    assert aligned_layer.data is small_image
+    np.testing.assert_array_equal(aligned_layer.translate, (30, 40))
+    np.testing.assert_array_equal(small_layer.translate, (0, 0))
+    assert small_layer.blending == "translucent"
+    assert widget._overlay_layer is None
+
+
+def test_replaced_layer_data_is_padded_to_new_shape(make_napari_viewer):
+    """Test that apply and export use the layer shapes at the time they run."""
+    viewer = make_napari_viewer()
+    base_layer = viewer.add_image(np.zeros((100, 100)), name="base_image")
+    small_layer = viewer.add_image(np.ones((20, 20)), name="small_image")
+    
+    widget = InteractiveImageAlignment(viewer)
+    widget._base_image_combo.value = base_layer
+    widget._small_image_combo.value = small_layer
+    widget._start_alignment()
+    
+    # Replace both images after alignment started
+    base_layer.data = np.zeros((80, 120))
+    small_layer.data = np.ones((10, 30))
+    small_layer.translate = (5, 7)
+    widget._apply_padding()
+    widget._export_padding()
+    padded = viewer.layers["small_image_padded"].data
+    assert padded.shape == (80, 120)
+    assert padded[5:15, 7:37].all()
+    assert padded.sum() == 10 * 30
+
+
+def test_alignment_with_scaled_base(make_napari_viewer):
+    """Test that world offsets are converted with the base layer's scale."""
+    viewer = make_napari_viewer()
+    base_layer = viewer.add_image(
+        np.zeros((100, 100)), name="base_image", scale=(2, 2), translate=(10, 20)
+    )
+    small_layer = viewer.add_image(
+        np.ones((20, 30)), name="small_image", scale=(2, 2), translate=(10, 20)
+    )
+    
+    widget = InteractiveImageAlignment(viewer)
+    widget._base_image_combo.value = base_layer
+    widget._small_image_combo.value = small_layer
+    widget._start_alignment()
+    
+    # 30 and 10 world units from the base origin are 15 and 5 base pixels
+    small_layer.translate = (40, 30)
+    widget._apply_padding()
+    assert widget._aligned_offset == (15, 5)
+    
+    aligned_layer = viewer.layers["small_image_aligned"]
+    np.testing.assert_array_equal(aligned_layer.translate, (40, 30))
+    np.testing.assert_array_equal(aligned_layer.scale, (2, 2))
+    
+    widget._export_padding()
+    padded_layer = viewer.layers["small_image_padded"]
+    assert padded_layer.data.shape == (100, 100)
+    assert padded_layer.data[15:35, 5:35].all()
+    assert padded_layer.data.sum() == 20 * 30
+    np.testing.assert_array_equal(padded_layer.translate, (10, 20))
+    np.testing.assert_array_equal(padded_layer.scale, (2, 2))
+
+
+def test_alignment_with_rgb_images(make_napari_viewer):
+    """Test that RGB channel axes are not treated as spatial axes."""
+    viewer = make_napari_viewer()
+    base_layer = viewer.add_image(
+        np.zeros((60, 80, 3), dtype=np.uint8), name="base_image", scale=(2, 2)
+    )
+    small_layer = viewer.add_image(
+        np.full((10, 20, 3), 255, dtype=np.uint8), name="small_image", scale=(2, 2)
+    )
+    assert base_layer.rgb and small_layer.rgb
+    
+    widget = InteractiveImageAlignment(viewer)
+    widget._base_image_combo.value = base_layer
+    widget._small_image_combo.value = small_layer
+    widget._start_alignment()
+    
+    small_layer.translate = (8, 12)
+    widget._apply_padding()
+    assert widget._aligned_offset == (4, 6)
+    np.testing.assert_array_equal(
+        viewer.layers["small_image_aligned"].translate, (8, 12)
+    )
+    
+    widget._export_padding()
+    padded = viewer.layers["small_image_padded"].data
+    assert padded.shape == (60, 80, 3)
+    assert (padded[4:14, 6:26] == 255).all()
+    assert int(padded.sum()) == 10 * 20 * 3 * 255
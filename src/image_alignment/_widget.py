@@ -8,55 +8,106 @@ References:
 - Widget specification: https://napari.org/stable/plugins/building_a_plugin/guides.html#widgets
 - magicgui docs: https://pyapp-kit.github.io/magicgui/
 """
-from typing import TYPE_CHECKING, Tuple
+import functools
+import logging
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Tuple, Union
 
+import dask.array as da
 import numpy as np
-from magicgui.widgets import Container, create_widget, PushButton, Label
+from magicgui.widgets import CheckBox, ComboBox, Container, PushButton, Label
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to NumPy copies
+    njit = None
+
+try:
+    import cv2
+except ImportError:  # OpenCV is optional; fall back to NumPy padding
+    cv2 = None
+
+# dtypes padded with cv2.copyMakeBorder when OpenCV is available
+_CV2_DTYPES = (np.uint8, np.uint16, np.float32)
 
 if TYPE_CHECKING:
     import napari
 
+logger = logging.getLogger(__name__)
+
 
 class InteractiveImageAlignment(Container):
     """Widget for interactive image alignment with automatic padding."""
     
+    # Padded outputs larger than this many bytes are built as dask arrays
+    LARGE_BYTES_THRESHOLD = 2 ** 30
+    
     def __init__(self, viewer: "napari.viewer.Viewer"):
         super().__init__()
         self._viewer = viewer
         self._overlay_layer = None
+        self._overlay_saved_state = None
         self._base_image_layer = None
         self._small_image_layer = None
         self._is_aligning = False
+        self._aligned_offset = None
         
         # Create widgets
-        self._base_image_combo = create_widget(
-            label="Base Image (Large)", annotation="napari.layers.Image"
-        )
-        self._small_image_combo = create_widget(
-            label="Small Image", annotation="napari.layers.Image"
-        )
+        self._base_image_combo = ComboBox(label="Base Image (Large)", choices=[])
+        self._small_image_combo = ComboBox(label="Small Image", choices=[])
+        self._refresh_layer_choices()
         
         self._start_alignment_btn = PushButton(text="Start Interactive Alignment")
         self._apply_padding_btn = PushButton(text="Apply Padding")
         self._apply_padding_btn.enabled = False
+        self._export_btn = PushButton(text="Export Padded Image")
+        self._export_btn.enabled = False
+        self._materialize_checkbox = CheckBox(
+            text="Pad on apply instead of translating", value=False
+        )
+        self._quantize_checkbox = CheckBox(
+            text="Quantize float64 export to uint8", value=False
+        )
         
         self._status_label = Label(value="Select base and small images, then click 'Start Interactive Alignment'")
         
         # Connect callbacks
         self._start_alignment_btn.clicked.connect(self._start_alignment)
         self._apply_padding_btn.clicked.connect(self._apply_padding)
+        self._export_btn.clicked.connect(self._export_padding)
         self._base_image_combo.changed.connect(self._on_layer_selection_changed)
         self._small_image_combo.changed.connect(self._on_layer_selection_changed)
         
+        # Push layer list changes into the dropdowns instead of having
+        # magicgui re-query the viewer's layers on every refresh
+        layer_events = self._viewer.layers.events
+        layer_events.inserted.connect(self._refresh_layer_choices)
+        layer_events.removed.connect(self._refresh_layer_choices)
+        layer_events.reordered.connect(self._refresh_layer_choices)
+        
         # Layout widgets
         self.extend([
             self._base_image_combo,
             self._small_image_combo,
             self._start_alignment_btn,
             self._apply_padding_btn,
+            self._export_btn,
+            self._materialize_checkbox,
+            self._quantize_checkbox,
             self._status_label,
         ])
     
+    def _refresh_layer_choices(self, event=None):
+        """Rebuild the layer dropdowns from the viewer's image layers."""
+        from napari.layers import Image
+        
+        choices = [
+            (layer.name, layer) for layer in self._viewer.layers
+            if isinstance(layer, Image)
+        ]
+        self._base_image_combo.choices = choices
+        self._small_image_combo.choices = choices
+    
     def _on_layer_selection_changed(self):
         """Update button states when layer selection changes."""
         base_selected = self._base_image_combo.value is not None
@@ -88,173 +139,377 @@ class InteractiveImageAlignment(Container):
         self._is_aligning = True
         self._start_alignment_btn.enabled = False
         self._apply_padding_btn.enabled = True
+        self._export_btn.enabled = False
         self._status_label.value = "Drag the overlay image to position it. Click 'Apply Padding' when ready."
     
     def _create_overlay_layer(self):
-        """Create an overlay layer for the small image."""
-        if self._overlay_layer is not None:
-            try:
-                self._viewer.layers.remove(self._overlay_layer)
-            except ValueError:
-                pass
-        
-        # Create overlay with the small image data
-        overlay_data = self._small_image_layer.data.copy()
-        overlay_name = f"{self._small_image_layer.name}_overlay"
+        """Turn the small image layer into a tinted overlay for positioning."""
+        self._restore_overlay_layer()
         
-        # Add as image layer with some transparency
-        self._overlay_layer = self._viewer.add_image(
-            overlay_data,
-            name=overlay_name,
-            opacity=0.7,
-            blending='additive',
-            colormap='red'
-        )
+        # Retint the small image layer in place instead of adding a second
+        # layer, which would upload another texture of the same data
+        layer = self._small_image_layer
+        self._overlay_saved_state = {
+            "colormap": layer.colormap,
+            "blending": layer.blending,
+            "opacity": layer.opacity,
+            "translate": np.array(layer.translate),
+        }
+        layer.colormap = 'red'
+        layer.blending = 'additive'
+        layer.opacity = 0.7
+        self._overlay_layer = layer
         
         # Make it the active layer for easy manipulation
         self._viewer.layers.selection.active = self._overlay_layer
     
+    def _restore_overlay_layer(self):
+        """Restore the appearance and position saved by _create_overlay_layer."""
+        if self._overlay_layer is None:
+            return
+        
+        for name, value in self._overlay_saved_state.items():
+            setattr(self._overlay_layer, name, value)
+        self._overlay_layer = None
+        self._overlay_saved_state = None
+    
     def _apply_padding(self):
         """Apply padding to the small image based on current overlay position."""
         if self._overlay_layer is None or self._base_image_layer is None:
             self._status_label.value = "Error: Missing layers"
             return
         
-        # Get dimensions first
-        base_shape = self._base_image_layer.data.shape
-        small_shape = self._small_image_layer.data.shape
-        
-        # Get the current position of the overlay (use extent.world for accuracy)
-        overlay_extent = self._overlay_layer.extent
-        base_extent = self._base_image_layer.extent
-
-        # Get the top-left corner of each layer in world coordinates
-        overlay_world_pos = overlay_extent.world[0]
-        base_world_pos = base_extent.world[0]
+        # Read each layer property once: extent recomputes the world
+        # coordinates on every access
+        base_layer = self._base_image_layer
+        base_shape = tuple(base_layer.data.shape)
+        base_translate = base_layer.translate
+        base_scale = np.asarray(base_layer.scale)
+        base_world_pos = base_layer.extent.world[0]
+        small_data = self._small_image_layer.data
+        small_shape = tuple(small_data.shape)
+        overlay_world_pos = self._overlay_layer.extent.world[0]
 
-        # Calculate relative position in world coordinates and convert to pixels
+        # Calculate relative position of the top-left corners in world
+        # coordinates and convert to base image pixels
         relative_world_pos = overlay_world_pos - base_world_pos
-        relative_translate = tuple(int(round(relative_world_pos[i])) for i in range(len(relative_world_pos)))
-
-        # Also get base_translate for later use
-        base_translate = self._base_image_layer.translate
+        pixel_offset = np.rint(relative_world_pos / base_scale).astype(np.intp)
+        not_moved = not pixel_offset.any()
+        relative_translate = tuple(pixel_offset.tolist())
         
         # If overlay wasn't moved, fall back to center placement
-        if all(abs(t) < 0.5 for t in relative_translate):
+        if not_moved:
             center_y = (base_shape[0] - small_shape[0]) // 2
             center_x = (base_shape[1] - small_shape[1]) // 2
             relative_translate = (center_y, center_x)
         
-        # Calculate padding based on overlay position
+        # Offsets cover the spatial axes only, matching the layer's scale
+        # and translate; an RGB(A) channel axis is not positioned
+        offset = _resolve_offsets(relative_translate, base_shape[:base_layer.ndim])
+        logger.debug("Aligning %s into %s at offset %s", small_shape, base_shape, offset)
+        self._aligned_offset = offset
+
+        # Adding and restoring layers refreshes the dropdowns; keep their
+        # change callbacks quiet until the UI state below is final
+        with self._block_callbacks():
+            materialize = self._materialize_checkbox.value
+            if materialize:
+                padded_name = self._add_padded_layer()
+            else:
+                # Place the small image with a layer translate instead of padding
+                # it; the padded array is only built on export
+                padded_name = f"{self._small_image_layer.name}_aligned"
+                self._viewer.add_image(
+                    small_data,
+                    name=padded_name,
+                    opacity=0.8,
+                    scale=base_scale,
+                    translate=np.add(base_translate, np.multiply(offset, base_scale)),
+                )
+
+            # Restore the small image layer and reset UI
+            self._restore_overlay_layer()
+
+            self._is_aligning = False
+            self._start_alignment_btn.enabled = True
+            self._apply_padding_btn.enabled = False
+            self._export_btn.enabled = not materialize
+            self._status_label.value = f"Alignment complete! Created layer: {padded_name}"
+    
+    def _export_padding(self):
+        """Add the last alignment as a small image padded to the base shape."""
+        if self._aligned_offset is None or self._base_image_layer is None:
+            self._status_label.value = "Error: No alignment to export"
+            return
+        
+        with self._block_callbacks():
+            padded_name = self._add_padded_layer()
+        self._status_label.value = f"Export complete! Created layer: {padded_name}"
+    
+    @contextmanager
+    def _block_callbacks(self):
+        """Suppress the layer dropdown change callbacks within the block."""
+        with self._base_image_combo.changed.blocked(), \
+                self._small_image_combo.changed.blocked():
+            yield
+    
+    def _add_padded_layer(self) -> str:
+        """Add the small image padded to the base shape and return the layer name."""
+        # Resolve lazy (e.g. dask) data once rather than once per sliced copy
+        small_image = np.asarray(self._small_image_layer.data)
+        base_layer = self._base_image_layer
+        metadata = {}
+        # On request, float64 data is mapped onto uint8 to cut the padded
+        # array to an eighth; the original range is kept in the metadata
+        if (self._quantize_checkbox.value and small_image.dtype == np.float64
+                and small_image.ndim in (2, 3)):
+            small_image, lo, hi = _quantize_to_uint8(small_image)
+            metadata["quantized_range"] = (lo, hi)
+        
+        # Channel axes of an RGB(A) small image are copied whole at offset 0
+        channel_shape = small_image.shape[self._small_image_layer.ndim:]
         padded_image = self._pad_image_to_position(
-            self._small_image_layer.data,
-            base_shape,
-            relative_translate,
+            small_image,
+            tuple(base_layer.data.shape[:base_layer.ndim]) + channel_shape,
+            tuple(self._aligned_offset) + (0,) * len(channel_shape),
         )
-
-        # Add the padded image as a new layer (positioned with base layer translate)
-        padded_name = f"{self._small_image_layer.name}_aligned"
-        aligned_layer = self._viewer.add_image(
+        
+        padded_name = f"{self._small_image_layer.name}_padded"
+        self._viewer.add_image(
             padded_image,
             name=padded_name,
             opacity=0.8,
-            translate=base_translate,
+            scale=base_layer.scale,
+            translate=base_layer.translate,
+            metadata=metadata,
         )
+        return padded_name
+    
+    def _pad_image_to_position(self, small_image: np.ndarray, target_shape: Tuple[int, ...], 
+                              offset: Tuple[int, ...]) -> Union[np.ndarray, da.Array]:
+        """Pad the small image to match target shape at a pixel offset.
 
-        # Clean up overlay and reset UI
-        try:
-            self._viewer.layers.remove(self._overlay_layer)
-        except ValueError:
-            pass
-        self._overlay_layer = None
+        Outputs above ``LARGE_BYTES_THRESHOLD`` are returned as lazy dask
+        arrays; see ``_pad_image``.
+        """
+        return _pad_image(small_image, target_shape, offset, self.LARGE_BYTES_THRESHOLD)
 
-        self._is_aligning = False
-        self._start_alignment_btn.enabled = True
-        self._apply_padding_btn.enabled = False
-        self._status_label.value = f"Alignment complete! Created layer: {padded_name}"
+
+def _pad_image(small_image: np.ndarray, target_shape: Tuple[int, ...],
+               offset: Tuple[int, ...], large_bytes_threshold: int) -> Union[np.ndarray, da.Array]:
+    """Pad ``small_image`` to ``target_shape`` with its origin at ``offset``.
+
+    ``offset`` holds one integer pixel offset per axis of ``target_shape``.
+    An identity placement returns ``small_image`` itself, and a placement
+    entirely outside the target returns a read-only array of zeros.
+    Outputs above ``large_bytes_threshold`` bytes are returned as lazy dask
+    arrays.
+    """
+    small_shape = small_image.shape
+    if small_shape == tuple(target_shape) and not any(offset):
+        return small_image
     
-    def _pad_image_to_position(self, small_image: np.ndarray, target_shape: Tuple[int, ...], 
-                              translate: Tuple[float, ...]) -> np.ndarray:
-        """Pad the small image to match target shape based on translation."""
-        # IMPORTANT: napari translate is in world coordinates, not pixel coordinates
-        # We need to convert world coordinates to pixel coordinates
-        print(f"Raw translate: {translate}, target_shape dimensions: {len(target_shape)}")
-        
-        # For now, assume scale is (1, 1) - in the future we should get this from the layer
-        # napari coordinates are in (row, col) order, which is (y, x)
-        if len(target_shape) == 2:
-            # 2D case: translate should be (y, x) in world coordinates
-            if len(translate) >= 2:
-                # Convert world coordinates to pixel coordinates
-                # For now, assume 1:1 mapping (scale = 1)
-                offset_y, offset_x = int(round(translate[0])), int(round(translate[1]))
-            else:
-                offset_y, offset_x = 0, 0
-        else:
-            # 3D case: translate should be (z, y, x) in world coordinates
-            if len(translate) >= 3:
-                offset_z, offset_y, offset_x = int(round(translate[0])), int(round(translate[1])), int(round(translate[2]))
-            elif len(translate) >= 2:
-                offset_z = 0
-                offset_y, offset_x = int(round(translate[0])), int(round(translate[1]))
-            else:
-                offset_z, offset_y, offset_x = 0, 0, 0
-        
-        # Debug: Print offset information
-        if len(target_shape) == 2:
-            print(f"Calculated pixel offsets: y={offset_y}, x={offset_x}")
-        else:
-            print(f"Calculated pixel offsets: z={offset_z}, y={offset_y}, x={offset_x}")
-        
-        # Create padded image filled with zeros
-        padded = np.zeros(target_shape, dtype=small_image.dtype)
-        
-        # Calculate bounds for placement
-        if len(target_shape) == 2:
-            h, w = small_image.shape[:2]
-            
-            # Ensure placement is within bounds
-            start_y = max(0, offset_y)
-            start_x = max(0, offset_x)
-            end_y = min(target_shape[0], offset_y + h)
-            end_x = min(target_shape[1], offset_x + w)
-            
-            # Calculate corresponding regions in source image
-            src_start_y = max(0, -offset_y)
-            src_start_x = max(0, -offset_x)
-            src_end_y = src_start_y + (end_y - start_y)
-            src_end_x = src_start_x + (end_x - start_x)
-            
-            # Debug: Print placement information
-            print(f"Placement: start_y={start_y}, start_x={start_x}, end_y={end_y}, end_x={end_x}")
-            print(f"Source: src_start_y={src_start_y}, src_start_x={src_start_x}, src_end_y={src_end_y}, src_end_x={src_end_x}")
-            
-            # Place the image
-            if end_y > start_y and end_x > start_x:
-                padded[start_y:end_y, start_x:end_x] = small_image[src_start_y:src_end_y, src_start_x:src_end_x]
-                print(f"Successfully placed image at position ({start_y}:{end_y}, {start_x}:{end_x})")
-            else:
-                print("Warning: Invalid placement bounds - image not placed")
-        
-        else:  # 3D case
-            d, h, w = small_image.shape[:3]
-            
-            start_z = max(0, offset_z)
-            start_y = max(0, offset_y)
-            start_x = max(0, offset_x)
-            end_z = min(target_shape[0], offset_z + d)
-            end_y = min(target_shape[1], offset_y + h)
-            end_x = min(target_shape[2], offset_x + w)
-            
-            src_start_z = max(0, -offset_z)
-            src_start_y = max(0, -offset_y)
-            src_start_x = max(0, -offset_x)
-            src_end_z = src_start_z + (end_z - start_z)
-            src_end_y = src_start_y + (end_y - start_y)
-            src_end_x = src_start_x + (end_x - start_x)
-            
-            if end_z > start_z and end_y > start_y and end_x > start_x:
-                padded[start_z:end_z, start_y:end_y, start_x:end_x] = \
-                    small_image[src_start_z:src_end_z, src_start_y:src_end_y, src_start_x:src_end_x]
-        
-        return padded
+    if (np.prod(target_shape, dtype=np.int64) * small_image.dtype.itemsize
+            > large_bytes_threshold):
+        # Too large to hold in memory: let napari pull chunks as it renders
+        ndim = len(target_shape)
+        chunks = (1024, 1024) if ndim == 2 else (1,) * (ndim - 2) + (512, 512)
+        return _pad_image_lazy(small_image, target_shape, offset, chunks=chunks)
+    
+    # The slices only depend on the shapes and offset, so repeated
+    # alignments reuse a cached placement plan
+    dst_slices, src_slices, strips = _placement_plan(
+        tuple(offset), small_shape, tuple(target_shape)
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Pixel offset %s, placement %s, source %s",
+                     offset, dst_slices, src_slices)
+    
+    # Fast path: fully inside the target, so the small image is copied
+    # whole without re-slicing it
+    if src_slices is None:
+        if cv2 is not None and small_image.ndim == 2 and small_image.dtype in _CV2_DTYPES:
+            (top, left), (height, width) = offset, small_shape
+            return cv2.copyMakeBorder(
+                small_image,
+                top, target_shape[0] - top - height,
+                left, target_shape[1] - left - width,
+                cv2.BORDER_CONSTANT, value=0,
+            )
+    elif any(s.stop == s.start for s in dst_slices):
+        # Nothing lands inside the target: return a read-only zero view
+        # instead of allocating and clearing a full-size array
+        return np.broadcast_to(np.zeros((), dtype=small_image.dtype), target_shape)
+    
+    # Allocate without zeroing; only the border strips are cleared below
+    padded = np.empty(target_shape, dtype=small_image.dtype)
+    _place(padded, small_image, dst_slices, src_slices)
+    for strip in strips:
+        padded[strip].fill(0)
+    
+    return padded
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _blit3d(dst, src, z0, y0, x0, sz, sy, sx, dz, dy, dx):
+        """Copy a ``(dz, dy, dx)`` block of ``src`` into ``dst``, parallel over z."""
+        for z in prange(dz):
+            for y in range(dy):
+                dst[z0 + z, y0 + y, x0:x0 + dx] = src[sz + z, sy + y, sx:sx + dx]
+else:
+    _blit3d = None
+
+# dtypes the numba kernel can compile for; float16 and non-native byte
+# orders go through _copy_blocked instead
+_NUMBA_DTYPES = (
+    np.bool_, np.int8, np.int16, np.int32, np.int64,
+    np.uint8, np.uint16, np.uint32, np.uint64,
+    np.float32, np.float64, np.complex64, np.complex128,
+)
+
+
+def _place(padded: np.ndarray, small_image: np.ndarray, dst_slices: Tuple[slice, ...],
+           src_slices: tuple[slice, ...] | None = None) -> None:
+    """Copy ``small_image[src_slices]`` (all of it if None) to ``padded[dst_slices]``.
+
+    ``padded`` is always allocated with the small image's dtype, so the NumPy
+    copies use ``casting='no'``.
+    """
+    if (_blit3d is not None and padded.ndim == 3 and padded.dtype.isnative
+            and padded.dtype in _NUMBA_DTYPES):
+        src_starts = (0, 0, 0) if src_slices is None else (s.start for s in src_slices)
+        _blit3d(
+            padded, small_image,
+            *(s.start for s in dst_slices),
+            *src_starts,
+            *(s.stop - s.start for s in dst_slices),
+        )
+        return
+    
+    source = small_image if src_slices is None else small_image[src_slices]
+    if padded.ndim == 3:
+        _copy_blocked(padded[dst_slices], source)
+    else:
+        np.copyto(padded[dst_slices], source, casting='no')
+
+
+# Bytes copied per tile by _copy_blocked, sized to stay resident in L2
+_TILE_BYTES = 128 * 1024
+
+
+def _copy_blocked(dst: np.ndarray, src: np.ndarray) -> None:
+    """Copy a 3D ``src`` into ``dst`` in (z, y) tiles of about ``_TILE_BYTES``.
+
+    Tiling keeps each read and write cache-resident when ``src`` is a
+    strided or transposed view whose layout differs from ``dst``.
+    """
+    depth, height, width = dst.shape
+    rows = max(1, _TILE_BYTES // max(1, width * dst.itemsize))
+    tile_y = min(height, rows)
+    tile_z = max(1, rows // height)
+    for z in range(0, depth, tile_z):
+        for y in range(0, height, tile_y):
+            np.copyto(dst[z:z + tile_z, y:y + tile_y], src[z:z + tile_z, y:y + tile_y],
+                      casting='no')
+
+
+def _quantize_to_uint8(image: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    """Linearly map ``image`` onto uint8, returning ``(quantized, lo, hi)``.
+
+    ``lo`` and ``hi`` are the minimum and maximum of the finite values, which
+    map to 0 and 255 respectively; values are rounded to the nearest level.
+    NaN and infinite pixels map to 0, as do the zeros added by padding, so in
+    quantized data 0 stands for ``lo`` rather than for 0.
+    """
+    finite = np.isfinite(image)
+    if not finite.any():
+        return np.zeros(image.shape, dtype=np.uint8), 0.0, 0.0
+    
+    finite_values = image[finite]
+    lo = float(finite_values.min())
+    hi = float(finite_values.max())
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    quantized = np.where(finite, image, lo)
+    quantized -= lo
+    quantized *= scale
+    np.rint(quantized, out=quantized)
+    return quantized.astype(np.uint8), lo, hi
+
+
+def _resolve_offsets(translate: Tuple[float, ...],
+                     target_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Convert a pixel-space translation to integer offsets into ``target_shape``.
+
+    napari orders axes as (..., z, y, x), so the translation is aligned to the
+    trailing axes; missing leading axes get a zero offset and extra leading
+    entries are ignored.
+    """
+    ndim = len(target_shape)
+    trailing = tuple(int(round(t)) for t in translate[max(0, len(translate) - ndim):])
+    return (0,) * (ndim - len(trailing)) + trailing
+
+
+def _pad_image_lazy(small_image: np.ndarray, target_shape: Tuple[int, ...],
+                    offset: Tuple[int, ...], chunks="auto") -> da.Array:
+    """Return a dask array of ``target_shape`` with ``small_image`` at ``offset``.
+
+    The zeros are generated per chunk on demand and only chunks overlapping
+    the small image copy from it, so nothing of the full target size is
+    allocated up front.
+    """
+    padded = da.zeros(target_shape, dtype=small_image.dtype, chunks=chunks)
+    dst_slices, src_slices = _compute_slices(offset, small_image.shape, target_shape)
+    if all(s.stop > s.start for s in dst_slices):
+        padded[dst_slices] = small_image[src_slices]
+    return padded
+
+
+def _compute_slices(offset: Tuple[int, ...], small_shape: Tuple[int, ...],
+                    target_shape: Tuple[int, ...]) -> Tuple[Tuple[slice, ...], Tuple[slice, ...]]:
+    """Return ``(dst_slices, src_slices)`` placing ``small_shape`` at ``offset``.
+
+    The destination slices index into an array of ``target_shape``; the source
+    slices select the part of the small image that falls inside it. When the
+    placement lies entirely outside the target, the slices are empty.
+    """
+    dst_slices = []
+    src_slices = []
+    for o, s, t in zip(offset, small_shape, target_shape, strict=False):
+        start = min(max(0, o), t)
+        end = max(start, min(t, o + s))
+        src_start = max(0, -o)
+        dst_slices.append(slice(start, end))
+        src_slices.append(slice(src_start, src_start + (end - start)))
+    return tuple(dst_slices), tuple(src_slices)
+
+
+def _border_strips(dst_slices: Tuple[slice, ...]) -> Tuple[Tuple[slice, ...], ...]:
+    """Return index tuples covering everything outside ``dst_slices``.
+
+    Two strips are produced per axis (before and after the region), restricted
+    to the region along the preceding axes, so no element is covered twice.
+    """
+    strips = []
+    for axis, region in enumerate(dst_slices):
+        prefix = dst_slices[:axis]
+        strips.append(prefix + (slice(0, region.start),))
+        strips.append(prefix + (slice(region.stop, None),))
+    return tuple(strips)
+
+
+@functools.lru_cache(maxsize=64)
+def _placement_plan(offset: Tuple[int, ...], small_shape: Tuple[int, ...],
+                    target_shape: Tuple[int, ...]):
+    """Return ``(dst_slices, src_slices, border_strips)`` for a placement.
+
+    ``src_slices`` is None when the small image lies fully inside the target
+    and is copied whole.
+    """
+    if all(o >= 0 and o + s <= t
+           for o, s, t in zip(offset, small_shape, target_shape, strict=False)):
+        dst_slices = tuple(slice(o, o + s) for o, s in zip(offset, small_shape, strict=False))
+        src_slices = None
+    else:
+        dst_slices, src_slices = _compute_slices(offset, small_shape, target_shape)
+    return dst_slices, src_slices, _border_strips(dst_slices)